@@ -7,7 +7,58 @@ import time
 import smbus  # note that you have to install smbus using apt
 import threading
 
-bus = smbus.SMBus(1)  # For revision 1 Raspberry Pi, change to bus = smbus.SMBus(0)
+
+
+class CountingBus:
+    """
+    Thin wrapper around an SMBus that keeps statistics on every I2C transfer (used for diagnostics)
+    """
+    def __init__(self, smbus_obj):
+        self._bus = smbus_obj
+        self._stats_lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.errors = 0
+        self.busy_time = 0.0  # seconds spent inside the smbus calls
+
+    def _call(self, func, is_write, *args):
+        start = time.monotonic()
+        try:
+            return func(*args)
+        except Exception:
+            with self._stats_lock:
+                self.errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            with self._stats_lock:
+                if is_write:
+                    self.writes += 1
+                else:
+                    self.reads += 1
+                self.busy_time += elapsed
+
+    def read_word_data(self, addr, cmd):
+        return self._call(self._bus.read_word_data, False, addr, cmd)
+
+    def write_byte_data(self, addr, cmd, value):
+        return self._call(self._bus.write_byte_data, True, addr, cmd, value)
+
+    def write_i2c_block_data(self, addr, cmd, vals):
+        return self._call(self._bus.write_i2c_block_data, True, addr, cmd, vals)
+
+    def get_stats(self):
+        """
+        Get a snapshot of the bus statistics
+
+        :return: a dict with the read, write and error counts and the total time spent on the bus (in ms)
+        """
+        with self._stats_lock:
+            return {"reads": self.reads, "writes": self.writes, "errors": self.errors,
+                    "busy_ms": round(self.busy_time * 1000, 1)}
+
+
+bus = CountingBus(smbus.SMBus(1))  # For revision 1 Raspberry Pi, change to bus = smbus.SMBus(0)
 pzaddr = 0x22  # I2C address of Picon Zero
 
 # Definitions of Commands to Picon Zero
@@ -306,3 +357,12 @@ def cleanup():
                     print("error in cleanup(), retrying", file=sys.stderr)
                     print(e, file=sys.stderr)
         return EXCEEDED_RETRIES
+
+
+def get_bus_stats():
+    """
+    Get statistics on the I2C traffic to the Picon Zero (doesn't touch the board)
+
+    :return: a dict with the read, write and error counts and the total time spent on the bus (in ms)
+    """
+    return bus.get_stats()
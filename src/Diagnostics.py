@@ -0,0 +1,200 @@
+"""
+On-demand diagnostics for the robots (answered over the FMS REQUEST channel)
+
+The FMS sends a Packet(PacketType.REQUEST, DiagnosticRequest(...)) and the robot answers with a
+Packet(PacketType.RESPONSE, DiagnosticData). Profiling is done by sampling the stacks of all threads
+from a side thread, so the control loop never has to be instrumented.
+"""
+import os
+import sys
+import time
+from collections import Counter
+from threading import Thread, Event, Lock, enumerate as enumerate_threads, get_ident
+
+import libs.piconzero as piconzero
+
+SAMPLE_INTERVAL = 0.01  # seconds between stack samples
+MAX_OVERHEAD = 0.02  # max fraction of time the sampler is allowed to spend taking samples
+MAX_DEPTH = 32  # max number of frames walked per stack
+DEFAULT_TOP = 5  # number of hot functions to report (keep the response packet small)
+
+
+class DiagnosticRequest:
+    """
+    Request data for diagnostics, sent in a REQUEST packet
+    """
+    PROFILE_START = "profile_start"
+    PROFILE_STOP = "profile_stop"
+    DUMP = "dump"
+
+    def __init__(self, action=DUMP, top=DEFAULT_TOP):
+        self.action = action
+        self.top = top
+
+
+class DiagnosticData:
+    """
+    Response data for a DiagnosticRequest
+    """
+    def __init__(self, profiling, samples, interval_ms, overhead, hot, threads, network, bus):
+        self.profiling = profiling  # True if the sampler is running
+        self.samples = samples  # number of samples taken
+        self.interval_ms = interval_ms  # current sample interval
+        self.overhead = overhead  # measured sampler overhead (percent of wall time)
+        self.hot = hot  # list of [function, self %, total %]
+        self.threads = threads  # list of [name, alive, daemon, current location]
+        self.network = network  # NetworkManager queue stats
+        self.bus = bus  # piconzero I2C stats
+
+
+def _frame_name(frame, with_line=False):
+    code = frame.f_code
+    name = os.path.basename(code.co_filename) + ":" + code.co_name
+    if with_line:
+        name += ":" + str(frame.f_lineno)
+    return name
+
+
+class SamplingProfiler(Thread):
+    """
+    Statistical profiler, periodically samples the stack of every other thread
+    """
+    def __init__(self, interval=SAMPLE_INTERVAL, max_overhead=MAX_OVERHEAD):
+        Thread.__init__(self, name="SamplingProfiler", daemon=True)
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self._enabled = Event()
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Throw away all collected samples
+        """
+        with self._lock:
+            self._self_counts = Counter()
+            self._total_counts = Counter()
+            self.samples = 0
+            self.sample_time = 0.0
+            self.wall_time = 0.0
+            self.cur_interval = self.interval
+
+    def enable(self):
+        """
+        Start (or restart) profiling, previous results are discarded
+        """
+        self.reset()
+        if not self.is_alive():
+            self.start()
+        self._enabled.set()
+
+    def disable(self):
+        """
+        Stop profiling, the results are kept until the next enable()
+        """
+        self._enabled.clear()
+
+    def is_enabled(self):
+        return self._enabled.is_set()
+
+    def run(self):
+        while True:
+            self._enabled.wait()
+            start = time.monotonic()
+            self._sample()
+            cost = time.monotonic() - start
+
+            # Stretch the interval so that sampling never takes more than max_overhead of the time
+            interval = max(self.interval, cost / self.max_overhead)
+            time.sleep(interval)
+
+            with self._lock:
+                self.cur_interval = interval
+                self.sample_time += cost
+                self.wall_time += time.monotonic() - start
+
+    def _sample(self):
+        own_ident = get_ident()
+        self_counts = Counter()
+        total_counts = Counter()
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            self_counts[_frame_name(frame)] += 1
+
+            # Count each function once per stack, even if it is recursive
+            seen = set()
+            depth = 0
+            while frame is not None and depth < MAX_DEPTH:
+                seen.add(_frame_name(frame))
+                frame = frame.f_back
+                depth += 1
+            total_counts.update(seen)
+
+        with self._lock:
+            self._self_counts.update(self_counts)
+            self._total_counts.update(total_counts)
+            self.samples += 1
+
+    def get_overhead(self):
+        """
+        :return: the measured overhead of the sampler (percent of wall time)
+        """
+        with self._lock:
+            if self.wall_time == 0:
+                return 0.0
+            return round(100 * self.sample_time / self.wall_time, 2)
+
+    def get_hot(self, top=DEFAULT_TOP):
+        """
+        Get the functions that showed up most often on top of a stack
+
+        :param top: the number of functions to return
+        :return: a list of [function, self %, total %], hottest first
+        """
+        with self._lock:
+            if self.samples == 0:
+                return []
+            return [[name, round(100 * count / self.samples, 1),
+                     round(100 * self._total_counts[name] / self.samples, 1)]
+                    for name, count in self._self_counts.most_common(top)]
+
+
+def get_thread_states():
+    """
+    Get the state of every thread in the process
+
+    :return: a list of [name, alive, daemon, current location]
+    """
+    frames = sys._current_frames()
+    states = []
+    for t in enumerate_threads():
+        frame = frames.get(t.ident)
+        states.append([t.name, t.is_alive(), t.daemon, _frame_name(frame, True) if frame is not None else None])
+    return states
+
+
+class Diagnostics:
+    """
+    Answers DiagnosticRequests for the main loop
+    """
+    def __init__(self, netwk_mgr):
+        self._netwk_mgr = netwk_mgr
+        self.profiler = SamplingProfiler()
+
+    def handle(self, request):
+        """
+        Process a DiagnosticRequest
+
+        :param request: the request to process
+        :return: DiagnosticData describing the current state of the robot
+        """
+        if request.action == DiagnosticRequest.PROFILE_START:
+            self.profiler.enable()
+        elif request.action == DiagnosticRequest.PROFILE_STOP:
+            self.profiler.disable()
+
+        return DiagnosticData(self.profiler.is_enabled(), self.profiler.samples,
+                              round(self.profiler.cur_interval * 1000, 1), self.profiler.get_overhead(),
+                              self.profiler.get_hot(request.top), get_thread_states(),
+                              self._netwk_mgr.get_queue_stats(), piconzero.get_bus_stats())
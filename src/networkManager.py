@@ -22,6 +22,9 @@ class NetworkManager(threading.Thread):
         self.csock = None
         self.fms_addr = None
         self.recv_lock = threading.Lock()
+        self.recv_count = 0
+        self.send_count = 0
+        self.max_queue_depth = 0
 
     def run(self):
         self.csock, self.fms_addr = self.sock.accept()
@@ -30,6 +33,8 @@ class NetworkManager(threading.Thread):
                 pack = self.csock.recv(BUFFER_SIZE).decode()
                 self.recv_lock.acquire()
                 self.recv_packet_queue.append(pack)
+                self.recv_count += 1
+                self.max_queue_depth = max(self.max_queue_depth, len(self.recv_packet_queue))
                 self.recv_lock.release()
         self.csock.close()
                 
@@ -41,6 +46,13 @@ class NetworkManager(threading.Thread):
         self.recv_lock.release()
         return return_val
 
+    def get_queue_stats(self):
+        self.recv_lock.acquire()
+        stats = {"recv_queue": len(self.recv_packet_queue), "max_recv_queue": self.max_queue_depth,
+                 "received": self.recv_count, "sent": self.send_count}
+        self.recv_lock.release()
+        return stats
+
     def stop(self):
         self.keep_running = False
 
@@ -49,6 +61,7 @@ class NetworkManager(threading.Thread):
         if self.csock:
             try:
                 self.csock.send(pack.encode())
+                self.send_count += 1
             except Exception as e:
                 pass
 
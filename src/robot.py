@@ -10,6 +10,7 @@ from logging.handlers import RotatingFileHandler
 
 sys.path.append(os.getcwd())  # have to add this for local files
 from src.Watchdog import Watchdog
+from src.Diagnostics import Diagnostics, DiagnosticRequest
 import libs.piconzero as piconzero
 from core.network.Packet import Packet, PacketType
 from core.network.constants import *
@@ -167,6 +168,7 @@ def main():
     # Make robot stuff
     robot_disabled = True
     watchdog = Watchdog(logger)
+    diagnostics = Diagnostics(netwk_mgr)
 
     if is_elevator():
         piconzero.set_output_config(m_settings["motor_channel"], 1)  # set channel 0 to PWM mode
@@ -223,6 +225,10 @@ def main():
                                         RobotStateData.DISABLE if robot_disabled else RobotStateData.ENABLE)
 
                         netwk_mgr.send_packet(jsonpickle.encode(packet))
+                    elif type(pack.data) is DiagnosticRequest:
+                        # Send back a diagnostics dump (and start/stop the profiler if asked)
+                        packet = Packet(PacketType.RESPONSE, diagnostics.handle(pack.data))
+                        netwk_mgr.send_packet(jsonpickle.encode(packet))
 
                 elif pack.type == PacketType.RESPONSE:
                     # do more stuff